@@ -3,6 +3,7 @@
 Most users should start with `PolicyEngine` and `load_policy`.
 """
 
+from .context import Strict
 from .engine import Decision, Policy, PolicyEngine
 from .errors import (
     PolicyLoadError,
@@ -10,7 +11,7 @@ from .errors import (
     RuleSyntaxError,
     UnknownRuleError,
 )
-from .loader import load_policy
+from .loader import load_policies, load_policy
 from .registry import RuleRegistry, get_default_registry
 
 __all__ = [
@@ -21,7 +22,9 @@ __all__ = [
     "RuleEvaluationError",
     "RuleRegistry",
     "RuleSyntaxError",
+    "Strict",
     "UnknownRuleError",
     "get_default_registry",
+    "load_policies",
     "load_policy",
 ]
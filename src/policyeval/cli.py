@@ -1,28 +1,89 @@
 from __future__ import annotations
 
-import argparse
-import json
 import sys
 
-from .engine import PolicyEngine
-from .loader import load_policy
+_EVALUATE_USAGE = """\
+usage: policyeval evaluate --policy POLICY --input INPUT [--strict STRICT] [--explain]
+
+options:
+  --policy POLICY  Policy JSON file path or inline JSON
+  --input INPUT    Inline JSON payload
+  --strict STRICT  Strict mode: off|warn|raise
+  --explain"""
+
+_VALUE_FLAGS = {"--policy": "policy", "--input": "input", "--strict": "strict"}
+_LONG_FLAGS = (*_VALUE_FLAGS, "--explain", "--help")
+
+
+def _expand_flag(flag: str) -> str:
+    """Expand a unique prefix of a long flag (e.g. "--pol"), as argparse does."""
+
+    if flag in _LONG_FLAGS or not flag.startswith("--") or flag == "--":
+        return flag
+    matches = [f for f in _LONG_FLAGS if f.startswith(flag)]
+    if len(matches) > 1:
+        raise ValueError(f"ambiguous option: {flag} could match {', '.join(matches)}")
+    return matches[0] if matches else flag
+
+
+def _parse_evaluate_args(argv: list[str]) -> dict[str, object]:
+    """Parse `evaluate` flags, raising ValueError with a message when invalid."""
+
+    args: dict[str, object] = {"policy": None, "input": None, "strict": None, "explain": False, "help": False}
+    i = 0
+    while i < len(argv):
+        arg = argv[i]
+        flag, eq, inline = arg.partition("=")
+        flag = _expand_flag(flag)
+        if flag in _VALUE_FLAGS:
+            if eq:
+                value = inline
+            elif i + 1 < len(argv) and not argv[i + 1].startswith("--"):
+                i += 1
+                value = argv[i]
+            else:
+                raise ValueError(f"argument {flag}: expected one argument")
+            args[_VALUE_FLAGS[flag]] = value
+        elif flag == "--explain" and not eq:
+            args["explain"] = True
+        elif flag in {"-h", "--help"} and not eq:
+            args["help"] = True
+            return args
+        else:
+            raise ValueError(f"unrecognized arguments: {arg}")
+        i += 1
+
+    if args["strict"] not in {None, "off", "warn", "raise"}:
+        raise ValueError(f"argument --strict: invalid choice: {args['strict']!r} (choose from off, warn, raise)")
+
+    missing = [f for f in ("--policy", "--input") if args[_VALUE_FLAGS[f]] is None]
+    if missing:
+        raise ValueError(f"the following arguments are required: {', '.join(missing)}")
+    return args
 
 
 def _cmd_evaluate(argv: list[str]) -> int:
-    p = argparse.ArgumentParser(prog="policyeval evaluate")
-    p.add_argument("--policy", required=True, help="Policy JSON file path or inline JSON")
-    p.add_argument("--input", required=True, help="Inline JSON payload")
-    p.add_argument("--strict", default=None, help="Strict mode: off|warn|raise")
-    p.add_argument("--explain", action="store_true")
-    args = p.parse_args(argv)
+    try:
+        args = _parse_evaluate_args(argv)
+    except ValueError as exc:
+        print(_EVALUATE_USAGE.splitlines()[0], file=sys.stderr)
+        print(f"policyeval evaluate: error: {exc}", file=sys.stderr)
+        return 2
+    if args["help"]:
+        print(_EVALUATE_USAGE)
+        return 0
+
+    from .engine import PolicyEngine
+    from .loader import load_policy
+    from .utils import json_dumps_pretty, json_loads
 
-    policy = load_policy(args.policy)
-    payload = json.loads(args.input)
+    policy = load_policy(args["policy"])
+    payload = json_loads(args["input"])
 
     engine = PolicyEngine()
-    decision = engine.evaluate(policy, payload, strict=args.strict, explain=args.explain)
-    if args.explain:
-        print(json.dumps(decision.explanation, indent=2, sort_keys=True))
+    decision = engine.evaluate(policy, payload, strict=args["strict"], explain=args["explain"])
+    if args["explain"]:
+        print(json_dumps_pretty(decision.explanation))
     else:
         print("allow" if decision.allowed else "deny")
 
@@ -0,0 +1,88 @@
+from __future__ import annotations
+
+from collections import Counter
+from collections.abc import Callable, Collection, Iterator
+from contextlib import contextmanager
+from typing import Any
+
+_INDENT = "    "
+_UNSET = object()
+
+
+class CodeGen:
+    """Builds the source of one generated function.
+
+    Rules add statements through `Rule.emit`. Values the generated code needs
+    (rule values, functions, exception types) are passed in as globals named
+    by `const`; context attributes are read once into locals named by `local`.
+
+    Paths in `shared_paths` are looked up at most once per call and then kept
+    in a local variable; `path_uses` counts the lookups emitted per path, so a
+    first pass can find the paths worth sharing.
+    """
+
+    def __init__(self, shared_paths: Collection[str] = ()) -> None:
+        self.namespace: dict[str, Any] = {}
+        self.path_uses: Counter[str] = Counter()
+        self._const_names: dict[int, str] = {}  # id(value) -> name; namespace keeps value alive
+        self._lines: list[str] = []
+        self._locals: dict[str, str] = {}
+        self._depth = 1
+        self._slots = {path: f"p{i}" for i, path in enumerate(shared_paths)}
+
+    def const(self, value: Any) -> str:
+        """Return an expression for `value`: a literal where safe, else a global."""
+
+        if value is None or type(value) in (str, bool) or (type(value) is int and -(2**63) <= value < 2**63):
+            return repr(value)
+        name = self._const_names.get(id(value))
+        if name is None:
+            name = self._const_names[id(value)] = f"_c{len(self.namespace)}"
+            self.namespace[name] = value
+        return name
+
+    def local(self, name: str, expr: str) -> str:
+        """Bind `expr` (e.g. "ctx.metrics") to local `name` at function entry."""
+
+        self._locals.setdefault(name, expr)
+        return name
+
+    def lookup(self, key: str, path: str) -> str:
+        """Return an expression for `ctx.lookup_raw(key, path)`."""
+
+        self.path_uses[path] += 1
+        call = f"{self.local('lookup', 'ctx.lookup_raw')}({self.const(key)}, {self.const(path)})"
+        slot = self._slots.get(path)
+        if slot is None:
+            return call
+        unset = self.local("unset", self.const(_UNSET))
+        self.local(slot, unset)
+        self.line(f"if {slot} is {unset}: {slot} = {call}")
+        return slot
+
+    def bump(self, metric: str) -> None:
+        """Emit the equivalent of `ctx.bump_raw(metric)`."""
+
+        enabled = self.local("metrics_enabled", "ctx.metrics_enabled")
+        metrics = self.local("metrics", "ctx.metrics")
+        self.line(f"if {enabled}: {metrics}[{metric!r}] += 1")
+
+    def line(self, text: str) -> None:
+        self._lines.append(_INDENT * self._depth + text)
+
+    @contextmanager
+    def block(self, header: str) -> Iterator[None]:
+        self.line(header)
+        self._depth += 1
+        try:
+            yield
+        finally:
+            self._depth -= 1
+
+    def build(self, name: str, params: str, filename: str) -> Callable[..., Any]:
+        """Compile the accumulated statements into function `name`."""
+
+        prologue = [f"{_INDENT}{local} = {expr}" for local, expr in self._locals.items()]
+        src = "\n".join([f"def {name}({params}):", *prologue, *self._lines]) + "\n"
+        exec(compile(src, filename, "exec"), self.namespace)
+        return self.namespace[name]
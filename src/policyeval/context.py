@@ -1,13 +1,50 @@
 from __future__ import annotations
 
+import threading
+from collections import defaultdict
+from collections.abc import Callable
 from dataclasses import dataclass, field
-from datetime import datetime, timezone
+from datetime import datetime
+from enum import Enum
 from typing import Any
 
-from .utils import normalize_key
+from .errors import RuleEvaluationError
+from .utils import get_part, normalize_key, utc_now
 
 
-@dataclass
+class Strict(str, Enum):
+    """How rules treat missing input values.
+
+    Members are strings equal to their lowercase names (`Strict.WARN ==
+    "warn"`), so they compare and hash like the plain strings used before.
+    """
+
+    OFF = "off"
+    WARN = "warn"
+    RAISE = "raise"
+
+    @classmethod
+    def parse(cls, value: Strict | str) -> Strict:
+        """Accept a `Strict` member or its name ("off" | "warn" | "raise")."""
+
+        if isinstance(value, cls):
+            return value
+        try:
+            return _STRICT_BY_NAME[value]
+        except (KeyError, TypeError):
+            raise ValueError(f"strict mode must be one of off|warn|raise, not {value!r}") from None
+
+
+_STRICT_BY_NAME = {m.value: m for m in Strict}
+# Position of each mode's handler in `EvaluationContext._missing_handler`.
+_STRICT_INDEX = {m: i for i, m in enumerate(Strict)}
+
+_POOL_SIZE = 16
+_MISSING = object()
+_pool = threading.local()
+
+
+@dataclass(slots=True)
 class EvaluationContext:
     """Context passed to rules.
 
@@ -15,15 +52,134 @@ class EvaluationContext:
 
     Notes:
       - `vars` is for intermediate values and can be mutated by rules.
-      - `cache` is used to memoize expensive path lookups.
+      - `cache` is used to memoize expensive path lookups. `lookup` caches
+        every dotted prefix too, so rules on `user.role` and `user.id` walk
+        `input["user"]` only once. It holds at most `cache_maxsize` entries;
+        the oldest entry is evicted first.
+      - `metrics` are only recorded while `metrics_enabled` is true. The
+        engine turns them off when the caller cannot observe them.
+      - `on_missing(path)` applies the strict mode to a missing value: it
+        returns False, bumping the `missing` metric under WARN, or raises
+        under RAISE. It is resolved from `strict` when the context is created
+        or acquired, not on every call.
+      - `acquire`/`release` recycle contexts through a per-thread pool. A
+        released context is reset and must not be used again by its holder.
     """
 
     input: Any
     vars: dict[str, Any] = field(default_factory=dict)
     cache: dict[str, Any] = field(default_factory=dict)
-    metrics: dict[str, int] = field(default_factory=dict)
-    now: datetime = field(default_factory=lambda: datetime.now(timezone.utc))
-    strict: str = "warn"  # "off" | "warn" | "raise"
+    metrics: dict[str, int] = field(default_factory=lambda: defaultdict(int))
+    now: datetime | None = field(default_factory=utc_now)
+    strict: Strict = Strict.WARN
+    cache_maxsize: int = 1024
+    metrics_enabled: bool = True
+    on_missing: Callable[[str], bool] = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self) -> None:
+        self.strict = Strict.parse(self.strict)
+        self.on_missing = self._missing_handler()
+
+    @classmethod
+    def acquire(
+        cls, input: Any, now: datetime | None, strict: Strict, metrics_enabled: bool = True
+    ) -> EvaluationContext:
+        """Take a context from this thread's pool, or create one if it is empty."""
+
+        free = getattr(_pool, "free", None)
+        if not free:
+            return cls(input=input, now=now, strict=strict, metrics_enabled=metrics_enabled)
+        ctx = free.pop()
+        ctx.input = input
+        ctx.now = now
+        ctx.metrics_enabled = metrics_enabled
+        if ctx.strict is not strict:
+            ctx.strict = strict
+            ctx.on_missing = ctx._missing_handler()
+        return ctx
+
+    def release(self) -> None:
+        """Reset this context and return it to the current thread's pool."""
+
+        free = getattr(_pool, "free", None)
+        if free is None:
+            free = _pool.free = []
+        if len(free) >= _POOL_SIZE:
+            return
+        self.input = None
+        self.vars.clear()
+        self.cache.clear()
+        self.metrics.clear()
+        free.append(self)
+
+    def _missing_handler(self) -> Callable[[str], bool]:
+        return (self._missing_off, self._missing_warn, self._missing_raise)[_STRICT_INDEX[self.strict]]
+
+    def _missing_off(self, path: str) -> bool:
+        return False
+
+    def _missing_warn(self, path: str) -> bool:
+        if self.metrics_enabled:
+            self.metrics["missing"] += 1
+        return False
+
+    def _missing_raise(self, path: str) -> bool:
+        raise RuleEvaluationError(f"Missing value at path '{path}'")
+
+    def lookup(self, path: str) -> Any:
+        """Resolve `path` against the input, returning None when missing."""
+
+        return self.lookup_raw(f"path:{path}", path)
+
+    def lookup_raw(self, key: str, path: str) -> Any:
+        """Like `lookup`, but `key` must be the precomputed `"path:" + path`."""
+
+        cache = self.cache
+        value = cache.get(key, _MISSING)
+        if value is not _MISSING:
+            return value
+        # Walk back to the longest cached prefix (or the input), then step
+        # forward one segment at a time, caching every prefix on the way.
+        ends = [len(path)]
+        while True:
+            dot = path.rfind(".", 0, ends[-1])
+            if dot <= 0:
+                value = self.input
+                break
+            value = cache.get(f"path:{path[:dot]}", _MISSING)
+            if value is not _MISSING:
+                break
+            ends.append(dot)
+        start = dot + 1
+        for end in reversed(ends):
+            tail = path[start:end]
+            if tail:
+                value = get_part(value, tail)
+            self._cache_put(f"path:{path[:end]}", value)
+            start = end + 1
+        return value
+
+    def cache_get(self, key: str, factory: Callable[[], Any]) -> Any:
+        """Return the cached value for `key`, computing it with `factory` on a miss.
+
+        Hits are moved to the most-recently-used end of the cache.
+        """
+
+        cache = self.cache
+        try:
+            value = cache.pop(key)
+        except KeyError:
+            value = factory()
+            self._cache_put(key, value)
+            return value
+        cache[key] = value
+        return value
+
+    def _cache_put(self, key: str, value: Any) -> None:
+        cache = self.cache
+        if len(cache) >= self.cache_maxsize:
+            del cache[next(iter(cache))]
+        cache[key] = value
 
     def get_var(self, key: str, default: Any = None) -> Any:
         return self.vars.get(normalize_key(key), default)
@@ -31,6 +187,14 @@ class EvaluationContext:
     def set_var(self, key: str, value: Any) -> None:
         self.vars[normalize_key(key)] = value
 
+    def set_var_raw(self, key: str, value: Any) -> None:
+        """Like `set_var`, but `key` must already be normalized."""
+        self.vars[key] = value
+
     def bump(self, metric: str, amount: int = 1) -> None:
-        metric = normalize_key(metric)
-        self.metrics[metric] = self.metrics.get(metric, 0) + amount
+        self.bump_raw(normalize_key(metric), amount)
+
+    def bump_raw(self, metric: str, amount: int = 1) -> None:
+        """Like `bump`, but `metric` must already be normalized."""
+        if self.metrics_enabled:
+            self.metrics[metric] += amount
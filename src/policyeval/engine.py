@@ -1,28 +1,125 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
-from datetime import datetime, timezone
+import sys
+from collections.abc import Callable, Iterable
+from dataclasses import dataclass, field
+from datetime import datetime
+from functools import lru_cache
 from typing import Any
 
-from .context import EvaluationContext
+from .codegen import CodeGen
+from .context import EvaluationContext, Strict
 from .errors import PolicyLoadError
-from .loader import PolicySpec
+from .loader import VALID_EFFECTS, PolicySpec
 from .registry import RuleRegistry, get_default_registry
+from .rules import AllRule, AnyRule, NotRule, Rule, emit_all
+from .utils import utc_now
 
+_COMPILE_CACHE_SIZE = 128
+_RUNNER_MAX_RULES = 64
 
-@dataclass(frozen=True)
+Evaluator = Callable[[EvaluationContext], Any]
+Runner = Callable[[tuple[Evaluator, ...], EvaluationContext], bool]
+
+
+def _run_loop(evaluators: tuple[Evaluator, ...], ctx: EvaluationContext) -> bool:
+    for evaluate in evaluators:
+        if not evaluate(ctx):
+            return False
+    return True
+
+
+@lru_cache(maxsize=None)
+def _make_runner(n: int) -> Runner:
+    """Generate a straight-line short-circuit runner for `n` rules.
+
+    The runner receives the rules' bound `evaluate` methods. `_make_runner(3)`
+    is equivalent to::
+
+        def run(evaluators, ctx):
+            e0, e1, e2 = evaluators
+            return bool(e0(ctx) and e1(ctx) and e2(ctx))
+    """
+
+    if n == 0:
+        return lambda evaluators, ctx: True
+    if n > _RUNNER_MAX_RULES:
+        return _run_loop
+    names = [f"e{i}" for i in range(n)]
+    src = (
+        "def run(evaluators, ctx):\n"
+        f"    {', '.join(names)}, = evaluators\n"
+        f"    return bool({' and '.join(f'{e}(ctx)' for e in names)})\n"
+    )
+    namespace: dict[str, Any] = {}
+    exec(compile(src, f"<policyeval runner/{n}>", "exec"), namespace)
+    return namespace["run"]
+
+
+def _cost(rule: Rule) -> int:
+    return getattr(rule, "cost_hint", 10)
+
+
+def _reordered(rule: Rule) -> Rule:
+    """Rebuild built-in groups with their children sorted by `cost_hint`."""
+
+    t = type(rule)
+    if t is AllRule or t is AnyRule:
+        return t(type_name=rule.type_name, rules=tuple(sorted(map(_reordered, rule.rules), key=_cost)))
+    if t is NotRule:
+        return NotRule(type_name=rule.type_name, rule=_reordered(rule.rule))
+    return rule
+
+
+def _build_runner(name: str, rules: tuple[Any, ...]) -> Runner:
+    """Generate a runner with the whole rule tree inlined via `Rule.emit`.
+
+    Built-in rules become straight-line code, so a policy evaluates in one
+    frame plus calls to context helpers and custom rules. Falls back to
+    `_make_runner` if the tree is too deep for the compiler.
+    """
+
+    if not rules:
+        return _make_runner(0)
+    try:
+        # A dry run finds paths read by several rules; the real pass keeps
+        # those in locals instead of going back to the context cache.
+        probe = CodeGen()
+        emit_all(rules, probe, "matched")
+        gen = CodeGen([path for path, n in probe.path_uses.items() if n > 1])
+        emit_all(rules, gen, "matched")
+        gen.line("return bool(matched)")
+        return gen.build("run", "evaluators, ctx", f"<policyeval policy {name!r}>")
+    except (SyntaxError, RecursionError):
+        return _make_runner(len(rules))
+
+
+@dataclass(frozen=True, slots=True, eq=False)
 class Policy:
     """A compiled policy.
 
-    Policies are compiled from a `PolicySpec` plus a registry.
+    Policies are compiled from a `PolicySpec` plus a registry. `invert` is
+    derived from `effect`: a deny policy allows exactly when it does not match.
+    `uses_now` is true when any rule reads `ctx.now`. Policies compare and hash
+    by identity.
     """
 
     name: str
     effect: str
-    rules: list[Any]
+    rules: tuple[Any, ...]
+    invert: bool = field(init=False, repr=False)
+    uses_now: bool = field(init=False, repr=False)
+    _evaluators: tuple[Evaluator, ...] = field(init=False, repr=False)
+    _runner: Runner = field(init=False, repr=False)
+
+    def __post_init__(self) -> None:
+        object.__setattr__(self, "invert", self.effect != "allow")
+        object.__setattr__(self, "uses_now", any(getattr(r, "needs_now", True) for r in self.rules))
+        object.__setattr__(self, "_evaluators", tuple(r.evaluate for r in self.rules))
+        object.__setattr__(self, "_runner", _build_runner(self.name, self.rules))
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class Decision:
     allowed: bool
     policy: str
@@ -32,58 +129,176 @@ class Decision:
 
 
 class PolicyEngine:
-    """Evaluates policies against input payloads."""
+    """Evaluates policies against input payloads.
 
-    def __init__(self, registry: RuleRegistry | None = None, *, strict: str = "warn") -> None:
-        self.registry = registry or get_default_registry()
-        self.strict = strict
+    With `reorder=True`, compiled rules, and the children of nested `all`/`any`
+    rules, are sorted by their `cost_hint` so cheap rules run first. Rules
+    that run after a short-circuit are skipped, so reordering can change
+    which rules run at all: a rule that errors (or raises under
+    `strict="raise"`) may now run before one that used to decide the result
+    first, or vice versa. Explain details and metrics follow the new order.
+    """
+
+    def __init__(
+        self,
+        registry: RuleRegistry | None = None,
+        *,
+        strict: Strict | str = Strict.WARN,
+        reorder: bool = False,
+    ) -> None:
+        self._registry = registry
+        self.strict = Strict.parse(strict)
+        self.reorder = reorder
+        # id(spec) -> (spec, registry, registry version, reorder, policy). Holding
+        # the spec keeps its id from being reused; the rest detects config changes.
+        self._compile_cache: dict[int, tuple[PolicySpec, RuleRegistry, int, bool, Policy]] = {}
+
+    @property
+    def registry(self) -> RuleRegistry:
+        """The rule registry; the default one is only built on first use."""
+
+        if self._registry is None:
+            self._registry = get_default_registry()
+        return self._registry
+
+    @registry.setter
+    def registry(self, value: RuleRegistry) -> None:
+        self._registry = value
+        self._compile_cache.clear()
 
     def compile(self, spec: PolicySpec) -> Policy:
-        compiled = [self.registry.create(s) for s in spec.rules]
-        return Policy(name=spec.name, effect=spec.effect, rules=compiled)
+        if spec.effect not in VALID_EFFECTS:
+            raise PolicyLoadError("policy 'effect' must be 'allow' or 'deny'")
+        registry = self.registry
+        prebuilt = spec._compiled
+        if prebuilt is not None and prebuilt[0]() is registry and prebuilt[1] == registry._version:
+            compiled = prebuilt[2]
+        else:
+            compiled = tuple(registry.create(s) for s in spec.rules)
+        if self.reorder:
+            compiled = tuple(sorted(map(_reordered, compiled), key=_cost))
+        return Policy(name=spec.name, effect=sys.intern(spec.effect), rules=compiled)
+
+    def _compile_cached(self, spec: PolicySpec) -> Policy:
+        registry = self.registry
+        entry = self._compile_cache.get(id(spec))
+        if (
+            entry is not None
+            and entry[0] is spec
+            and entry[1] is registry
+            and entry[2] == registry._version
+            and entry[3] == self.reorder
+        ):
+            return entry[4]
+        compiled = self.compile(spec)
+        cache = self._compile_cache
+        cache.pop(id(spec), None)
+        if len(cache) >= _COMPILE_CACHE_SIZE:
+            del cache[next(iter(cache))]
+        cache[id(spec)] = (spec, registry, registry._version, self.reorder, compiled)
+        return compiled
+
+    def _resolve(self, policy: PolicySpec | Policy) -> Policy:
+        if type(policy) is Policy:
+            return policy
+        if isinstance(policy, PolicySpec):
+            return self._compile_cached(policy)
+        if isinstance(policy, Policy):
+            return policy
+        raise PolicyLoadError("policy must be a PolicySpec or Policy")
 
     def evaluate(
         self,
         policy: PolicySpec | Policy,
         input_data: Any,
         *,
-        strict: str | None = None,
+        strict: Strict | str | None = None,
         now: datetime | None = None,
         explain: bool = False,
+        trace: bool = False,
     ) -> Decision:
-        if now is None:
-            now = datetime.now(timezone.utc)
-        strict_mode = strict or self.strict
+        """Evaluate `policy` against `input_data`.
 
-        if isinstance(policy, PolicySpec):
-            compiled = self.compile(policy)
-        elif isinstance(policy, Policy):
-            compiled = policy
-        else:
-            raise PolicyLoadError("policy must be a PolicySpec or Policy")
+        `explain=True` attaches per-rule details. `trace=True` is a cheaper
+        alternative that only records the index of the first failing rule as
+        `{"failed_at": index}` (None when every rule matched).
+        """
 
-        ctx = EvaluationContext(input=input_data, now=now, strict=strict_mode)
+        compiled = self._resolve(policy)
+        if now is None and compiled.uses_now:
+            now = utc_now()
+        strict_mode = self.strict if strict is None else Strict.parse(strict)
+        return self._run(compiled, input_data, strict_mode, now, explain, trace)
 
-        matched = True
-        details: list[dict[str, Any]] = []
-        for rule in compiled.rules:
-            res = rule.evaluate(ctx)
+    def evaluate_many(
+        self,
+        policy: PolicySpec | Policy,
+        inputs: Iterable[Any],
+        *,
+        strict: Strict | str | None = None,
+        now: datetime | None = None,
+        explain: bool = False,
+        trace: bool = False,
+    ) -> list[Decision]:
+        """Evaluate one policy against many payloads.
+
+        The policy is compiled, and `strict`/`now` are resolved, once for the
+        whole batch.
+        """
+
+        compiled = self._resolve(policy)
+        if now is None and compiled.uses_now:
+            now = utc_now()
+        strict_mode = self.strict if strict is None else Strict.parse(strict)
+        run = self._run
+        return [run(compiled, x, strict_mode, now, explain, trace) for x in inputs]
+
+    def _run(
+        self,
+        compiled: Policy,
+        input_data: Any,
+        strict_mode: Strict,
+        now: datetime | None,
+        explain: bool,
+        trace: bool = False,
+    ) -> Decision:
+        # Metrics are only reported in explanations.
+        ctx = EvaluationContext.acquire(input_data, now, strict_mode, explain)
+        try:
+            explanation = None
             if explain:
-                details.append(rule.explain(ctx))
-            if not res:
-                matched = False
-                break
-
-        allowed = matched if compiled.effect == "allow" else (not matched)
-        explanation = None
-        if explain:
-            explanation = {
-                "matched": matched,
-                "effect": compiled.effect,
-                "metrics": dict(ctx.metrics),
-                "rules": details,
-            }
+                matched = True
+                details: list[dict[str, Any]] = []
+                for rule in compiled.rules:
+                    # explain() reports the rule's result, so don't evaluate twice.
+                    detail = rule.explain(ctx)
+                    details.append(detail)
+                    res = detail.get("result")
+                    if res is None:
+                        res = rule.evaluate(ctx)
+                    if not res:
+                        matched = False
+                        break
+                explanation = {
+                    "matched": matched,
+                    "effect": compiled.effect,
+                    "metrics": dict(ctx.metrics) if ctx.metrics else {},
+                    "rules": details,
+                }
+            elif trace:
+                failed_at = None
+                for i, evaluate in enumerate(compiled._evaluators):
+                    if not evaluate(ctx):
+                        failed_at = i
+                        break
+                matched = failed_at is None
+                explanation = {"failed_at": failed_at}
+            else:
+                matched = compiled._runner(compiled._evaluators, ctx)
+        finally:
+            ctx.release()
 
+        allowed = matched ^ compiled.invert
         return Decision(
             allowed=allowed,
             policy=compiled.name,
@@ -92,5 +307,7 @@ class PolicyEngine:
             explanation=explanation,
         )
 
-    def explain(self, policy: PolicySpec | Policy, input_data: Any, *, strict: str | None = None) -> dict[str, Any]:
+    def explain(
+        self, policy: PolicySpec | Policy, input_data: Any, *, strict: Strict | str | None = None
+    ) -> dict[str, Any]:
         return self.evaluate(policy, input_data, strict=strict, explain=True).explanation or {}
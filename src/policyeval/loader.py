@@ -1,57 +1,206 @@
 from __future__ import annotations
 
-import json
-from dataclasses import dataclass
+import os
+import sys
+import weakref
+from dataclasses import dataclass, field
+from functools import lru_cache
 from pathlib import Path
 from typing import Any
 
 from .errors import PolicyLoadError, RuleSyntaxError
 from .registry import RuleRegistry, get_default_registry
+from .utils import json_dumps_canonical, json_loads
+
+VALID_EFFECTS: frozenset[str] = frozenset(("allow", "deny"))
+
+_OPEN_FLAGS = os.O_RDONLY | getattr(os, "O_CLOEXEC", 0) | getattr(os, "O_BINARY", 0)
 
 
 @dataclass(frozen=True)
 class PolicySpec:
     name: str
     effect: str
-    rules: list[dict[str, Any]]
+    rules: tuple[dict[str, Any], ...]
+    # Rules built while validating, with a weak reference to the registry (and
+    # its version) that built them, so the engine can skip recompiling with an
+    # unchanged registry. Weak so cached specs do not keep registries alive.
+    # Not an init field, so `dataclasses.replace` does not carry it over.
+    _compiled: tuple[weakref.ref[RuleRegistry], int, tuple[Any, ...]] | None = field(
+        default=None, init=False, compare=False, repr=False
+    )
 
+    def __getstate__(self) -> dict[str, Any]:
+        # Prebuilt rules are a per-process cache (and hold a weakref); drop them.
+        return {**self.__dict__, "_compiled": None}
 
-def load_policy(source: Any, registry: RuleRegistry | None = None, *, base_dir: str | None = None) -> PolicySpec:
-    """Load a policy from a dict, JSON string, or JSON file path."""
+    def to_bytes(self) -> bytes:
+        """Canonical JSON bytes (sorted keys, compact) of the policy definition.
 
-    registry = registry or get_default_registry()
+        Raises ValueError if a rule value is NaN or infinite.
+        """
+
+        return json_dumps_canonical({"name": self.name, "effect": self.effect, "rules": list(self.rules)})
+
+
+def _is_inline_json(text: str) -> bool:
+    """True if the first non-whitespace character opens a JSON object or array.
+
+    Only the leading whitespace is scanned; `text` is never copied.
+    """
+
+    for ch in text:
+        if ch not in " \t\r\n":
+            return ch in "{["
+    return False
+
+
+def _read_bytes(path: str | os.PathLike[str]) -> bytes:
+    """Read a whole file, normally with a single read() sized from fstat()."""
+
+    fd = os.open(path, _OPEN_FLAGS)
     try:
-        if isinstance(source, (str, Path)):
-            text = str(source)
-            if text.strip().startswith("{"):
-                data = json.loads(text)
-            else:
-                path = Path(text)
-                if not path.is_absolute() and base_dir:
-                    path = Path(base_dir) / path
-                data = json.loads(path.read_text(encoding="utf-8"))
-        elif isinstance(source, dict):
-            data = source
+        size = os.fstat(fd).st_size
+        # Asking for one extra byte lets a single read both fetch the file and confirm EOF.
+        data = os.read(fd, size + 1)
+        if len(data) <= size:
+            return data
+        chunks = [data]
+        while chunk := os.read(fd, 65536):
+            chunks.append(chunk)
+        return b"".join(chunks)
+    finally:
+        os.close(fd)
+
+
+def load_policy(
+    source: Any,
+    registry: RuleRegistry | None = None,
+    *,
+    base_dir: str | None = None,
+    validate: bool = True,
+) -> PolicySpec:
+    """Load a policy from a dict, JSON string, or JSON file path.
+
+    Policies loaded from files are cached by path, modification time and size,
+    so reloading an unchanged file returns the same `PolicySpec`. A file
+    rewritten with the same size within the filesystem's timestamp
+    granularity is not detected until its modification time changes again
+    (e.g. by touching it).
+
+    With `validate=False` rule specs are not compiled here; invalid rules are
+    then only reported when a `PolicyEngine` first compiles the policy.
+    """
+
+    registry = registry or get_default_registry()
+    if type(source) is dict:
+        # The common programmatic case: skip all string/path handling.
+        return _spec_from_data(source, registry, validate)
+    if isinstance(source, (str, Path)):
+        text = os.fspath(source)
+        if _is_inline_json(text):
+            try:
+                data = json_loads(text)
+            except ValueError as exc:
+                raise PolicyLoadError(str(exc)) from exc
         else:
-            raise PolicyLoadError(f"Unsupported policy source type: {type(source).__name__}")
-
-        name = data.get("name")
-        effect = data.get("effect", "allow")
-        rules = data.get("rules") or []
-
-        if not isinstance(name, str) or not name:
-            raise PolicyLoadError("policy requires non-empty 'name'")
-        if effect not in {"allow", "deny"}:
-            raise PolicyLoadError("policy 'effect' must be 'allow' or 'deny'")
-        if not isinstance(rules, list):
-            raise PolicyLoadError("policy 'rules' must be a list")
-
-        # Validate rule specs early by compiling once.
-        for spec in rules:
-            if not isinstance(spec, dict):
-                raise RuleSyntaxError("rule spec must be a dict")
-            registry.create(spec)
-
-        return PolicySpec(name=name, effect=effect, rules=rules)
-    except (json.JSONDecodeError, OSError, RuleSyntaxError) as exc:
+            if base_dir and not os.path.isabs(text):
+                text = os.path.join(base_dir, text)
+            path_str = os.path.abspath(text)
+            try:
+                st = os.stat(path_str)
+            except OSError as exc:
+                raise PolicyLoadError(str(exc)) from exc
+            return _load_file_cached(
+                path_str, st.st_mtime_ns, st.st_size, weakref.ref(registry), registry._version, validate
+            )
+    elif isinstance(source, dict):
+        data = source
+    else:
+        raise PolicyLoadError(f"Unsupported policy source type: {type(source).__name__}")
+    return _spec_from_data(data, registry, validate)
+
+
+def load_policies(
+    dir_path: str | os.PathLike[str],
+    registry: RuleRegistry | None = None,
+    *,
+    validate: bool = True,
+) -> list[PolicySpec]:
+    """Load every `*.json` policy file in `dir_path`, sorted by file name.
+
+    Files share `load_policy`'s cache, so reloading an unchanged directory only
+    costs one directory scan and a stat per file. Errors name the failing file.
+    """
+
+    registry = registry or get_default_registry()
+    try:
+        with os.scandir(dir_path) as it:
+            entries = sorted(
+                (e for e in it if e.name.endswith(".json") and e.is_file()),
+                key=lambda e: e.name,
+            )
+        specs = []
+        for entry in entries:
+            st = entry.stat()
+            path_str = os.path.abspath(entry.path)
+            try:
+                spec = _load_file_cached(
+                    path_str, st.st_mtime_ns, st.st_size, weakref.ref(registry), registry._version, validate
+                )
+            except PolicyLoadError as exc:
+                raise PolicyLoadError(f"{path_str}: {exc}") from exc
+            specs.append(spec)
+    except OSError as exc:
+        raise PolicyLoadError(str(exc)) from exc
+    return specs
+
+
+@lru_cache(maxsize=256)
+def _load_file_cached(
+    path: str, mtime_ns: int, size: int, registry_ref: weakref.ref[RuleRegistry], version: int, validate: bool
+) -> PolicySpec:
+    # mtime_ns, size and version only take part in the cache key. The registry
+    # is keyed weakly so the cache does not keep discarded registries alive.
+    try:
+        raw = _read_bytes(path)
+    except OSError as exc:
         raise PolicyLoadError(str(exc)) from exc
+    try:
+        data = json_loads(raw)
+    except ValueError as exc:
+        # Covers JSONDecodeError from either backend and undecodable bytes.
+        raise PolicyLoadError(str(exc)) from exc
+    return _spec_from_data(data, registry_ref(), validate)
+
+
+def _spec_from_data(data: Any, registry: RuleRegistry, validate: bool) -> PolicySpec:
+    if not isinstance(data, dict):
+        raise PolicyLoadError("policy must be a JSON object")
+    name = data.get("name")
+    effect = data.get("effect", "allow")
+    rules = data.get("rules") or []
+
+    if not isinstance(name, str) or not name:
+        raise PolicyLoadError("policy requires non-empty 'name'")
+    if effect not in VALID_EFFECTS:
+        raise PolicyLoadError("policy 'effect' must be 'allow' or 'deny'")
+    effect = sys.intern(effect)
+    if not isinstance(rules, list):
+        raise PolicyLoadError("policy 'rules' must be a list")
+    if not validate:
+        return PolicySpec(name=name, effect=effect, rules=tuple(rules))
+
+    # Check every spec's type up front (exact dicts take the cheap path), then
+    # validate by compiling once and keep the result for the engine.
+    if not all(type(s) is dict for s in rules) and not all(isinstance(s, dict) for s in rules):
+        raise PolicyLoadError("rule spec must be a dict")
+    create = registry.create
+    try:
+        compiled = [create(spec) for spec in rules]
+    except RuleSyntaxError as exc:
+        raise PolicyLoadError(str(exc)) from exc
+
+    spec = PolicySpec(name=name, effect=effect, rules=tuple(rules))
+    object.__setattr__(spec, "_compiled", (weakref.ref(registry), registry._version, tuple(compiled)))
+    return spec
@@ -1,25 +1,63 @@
 from __future__ import annotations
 
+import math
 from collections.abc import Callable
+from functools import cache
 from typing import Any
 
 from .errors import RuleSyntaxError, UnknownRuleError
 from .rules import AllRule, AnyRule, NotRule, Rule, TruthyPathRule, parse_compare_rule
+from .utils import json_dumps_key
 
 RuleFactory = Callable[[dict[str, Any], "RuleRegistry"], Rule]
 
+_COMPILE_CACHE_SIZE = 1024
+
 
 class RuleRegistry:
-    """Registry mapping rule type names to factories."""
+    """Registry mapping rule type names to factories.
+
+    `create` memoizes rules by the canonical JSON form of their spec, so
+    identical specs (including repeated subtrees of `all`/`any` rules) share
+    one compiled rule. Only specs made entirely of plain JSON values, and
+    whose rule types were all registered with `memoize=True` (the built-in
+    rules are), are memoized: their rules are known to be immutable, which
+    makes the sharing safe. Everything else is built on every call.
+    """
+
+    __slots__ = ("_factories", "_get_factory", "_memoized_types", "_compile_cache", "_version", "__weakref__")
 
     def __init__(self) -> None:
         self._factories: dict[str, RuleFactory] = {}
+        self._get_factory = self._factories.get
+        self._memoized_types: set[str] = set()
+        self._compile_cache: dict[bytes, Rule] = {}
+        # Bumped on every change so caches of compiled rules can detect staleness.
+        self._version = 0
+
+    def register(self, type_name: str, factory: RuleFactory, *, memoize: bool = False) -> None:
+        """Register `factory` for `type_name`.
+
+        Pass `memoize=True` only if the factory builds immutable rules that
+        depend on nothing but the spec, so one instance can be shared.
+        """
 
-    def register(self, type_name: str, factory: RuleFactory) -> None:
         self._factories[type_name] = factory
+        if memoize:
+            self._memoized_types.add(type_name)
+        else:
+            self._memoized_types.discard(type_name)
+        self._version += 1
+        self.clear_compile_cache()
 
     def unregister(self, type_name: str) -> None:
         self._factories.pop(type_name, None)
+        self._memoized_types.discard(type_name)
+        self._version += 1
+        self.clear_compile_cache()
+
+    def clear_compile_cache(self) -> None:
+        self._compile_cache.clear()
 
     def create(self, spec: dict[str, Any]) -> Rule:
         if not isinstance(spec, dict):
@@ -27,36 +65,89 @@ class RuleRegistry:
         type_name = spec.get("type")
         if not isinstance(type_name, str) or not type_name:
             raise RuleSyntaxError("rule spec requires non-empty 'type'")
-        if type_name not in self._factories:
+        factory = self._get_factory(type_name)
+        if factory is None:
             raise UnknownRuleError(type_name)
-        return self._factories[type_name](spec, self)
-
-
-_default_registry: RuleRegistry | None = None
-
-
+        if not _is_memoizable(spec, self._memoized_types, set()):
+            return factory(spec, self)
+        try:
+            key = json_dumps_key(spec)
+        except (TypeError, ValueError):
+            return factory(spec, self)
+        rule = self._compile_cache.get(key)
+        if rule is None:
+            rule = factory(spec, self)
+            cache = self._compile_cache
+            if len(cache) >= _COMPILE_CACHE_SIZE:
+                del cache[next(iter(cache))]
+            cache[key] = rule
+        return rule
+
+
+def _is_memoizable(obj: Any, memoized_types: set[str], active: set[int]) -> bool:
+    """True if `obj` holds only exact JSON types and memoizable rule types.
+
+    Anything else (tuples, datetimes, non-str keys, NaN, self-containing
+    values) could serialize to the same key as a different spec, or not at all.
+    `active` holds the ids of the containers currently being walked.
+    """
+
+    t = type(obj)
+    if obj is None or t is str or t is bool or t is int:
+        return True
+    if t is float:
+        return math.isfinite(obj)
+    if t is not dict and t is not list:
+        return False
+    if id(obj) in active:
+        return False
+    active.add(id(obj))
+    try:
+        if t is list:
+            return all(_is_memoizable(v, memoized_types, active) for v in obj)
+        rule_type = obj.get("type")
+        if type(rule_type) is str and rule_type not in memoized_types:
+            return False
+        return all(type(k) is str and _is_memoizable(v, memoized_types, active) for k, v in obj.items())
+    finally:
+        active.discard(id(obj))
+
+
+@cache
 def get_default_registry() -> RuleRegistry:
-    global _default_registry
-    if _default_registry is None:
-        _default_registry = RuleRegistry()
-        register_builtin_rules(_default_registry)
-    return _default_registry
+    registry = RuleRegistry()
+    register_builtin_rules(registry)
+    return registry
 
 
 def register_builtin_rules(registry: RuleRegistry) -> None:
-    registry.register("compare", lambda spec, r: parse_compare_rule(spec))
+    registry.register("compare", lambda spec, r: parse_compare_rule(spec), memoize=True)
 
-    def _all(spec: dict[str, Any], r: RuleRegistry) -> Rule:
+    def _children(spec: dict[str, Any], r: RuleRegistry, kind: str) -> tuple[Rule, ...]:
         items = spec.get("rules") or []
         if not isinstance(items, list):
-            raise RuleSyntaxError("all rule requires list 'rules'")
-        return AllRule(type_name="all", rules=[r.create(s) for s in items])
+            raise RuleSyntaxError(f"{kind} rule requires list 'rules'")
+        create = r.create
+        return tuple([create(s) for s in items])
+
+    def _flatten(children: tuple[Rule, ...], cls: type[Rule]) -> tuple[Rule, ...]:
+        # all(all(a, b), c) is all(a, b, c) (likewise for any); splicing nested
+        # groups saves one evaluate() frame per level on every evaluation.
+        if not any(type(c) is cls for c in children):
+            return children
+        out: list[Rule] = []
+        for c in children:
+            if type(c) is cls:
+                out.extend(c.rules)  # type: ignore[attr-defined]
+            else:
+                out.append(c)
+        return tuple(out)
+
+    def _all(spec: dict[str, Any], r: RuleRegistry) -> Rule:
+        return AllRule(type_name="all", rules=_flatten(_children(spec, r, "all"), AllRule))
 
     def _any(spec: dict[str, Any], r: RuleRegistry) -> Rule:
-        items = spec.get("rules") or []
-        if not isinstance(items, list):
-            raise RuleSyntaxError("any rule requires list 'rules'")
-        return AnyRule(type_name="any", rules=[r.create(s) for s in items])
+        return AnyRule(type_name="any", rules=_flatten(_children(spec, r, "any"), AnyRule))
 
     def _not(spec: dict[str, Any], r: RuleRegistry) -> Rule:
         inner = spec.get("rule")
@@ -70,7 +161,7 @@ def register_builtin_rules(registry: RuleRegistry) -> None:
             raise RuleSyntaxError("truthy rule requires non-empty 'path'")
         return TruthyPathRule(type_name="truthy", path=path)
 
-    registry.register("all", _all)
-    registry.register("any", _any)
-    registry.register("not", _not)
-    registry.register("truthy", _truthy)
+    registry.register("all", _all, memoize=True)
+    registry.register("any", _any, memoize=True)
+    registry.register("not", _not, memoize=True)
+    registry.register("truthy", _truthy, memoize=True)
@@ -1,11 +1,15 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
+import operator
+import sys
+from collections.abc import Callable, Iterable
+from dataclasses import dataclass, field
 from typing import Any
 
+from .codegen import CodeGen
 from .context import EvaluationContext
 from .errors import RuleEvaluationError, RuleSyntaxError
-from .utils import deep_get, is_truthy
+from .utils import is_truthy
 
 
 class Rule:
@@ -13,10 +17,17 @@ class Rule:
 
     Rules are small predicates that are compiled from a dict spec.
 
-    Subclasses should implement `evaluate`.
+    Subclasses should implement `evaluate`. `cost_hint` is a rough, static
+    estimate of evaluation cost used when the engine reorders rules.
+    `needs_now` tells the engine whether the rule reads `ctx.now`; rules that
+    leave it True always get a timestamp.
     """
 
+    __slots__ = ()
+
     type_name: str = "rule"
+    cost_hint: int = 10
+    needs_now: bool = True
 
     def evaluate(self, ctx: EvaluationContext) -> bool:
         raise NotImplementedError
@@ -24,60 +35,90 @@ class Rule:
     def explain(self, ctx: EvaluationContext) -> dict[str, Any]:
         return {"type": self.type_name, "result": self.evaluate(ctx)}
 
+    def emit(self, gen: CodeGen, target: str) -> None:
+        """Emit statements that store this rule's result in `target`.
+
+        The generated code runs with `ctx` in scope. The default calls
+        `evaluate`; built-in rules inline their logic instead.
+        """
+
+        gen.line(f"{target} = {gen.const(self.evaluate)}(ctx)")
+
+
+_COMPARE_OPS: dict[str, Callable[[Any, Any], Any]] = {
+    "eq": operator.eq,
+    "ne": operator.ne,
+    "gt": operator.gt,
+    "gte": operator.ge,
+    "lt": operator.lt,
+    "lte": operator.le,
+    "in": lambda actual, value: actual in (value or []),
+    "contains": lambda actual, value: value in actual,
+    "exists": lambda actual, value: True,
+}
+
+
+def _in_members(items: list[Any]) -> Callable[[Any, Any], Any] | None:
+    """Build an `in` test backed by a frozenset of `items`, if they are hashable."""
+
+    try:
+        members = frozenset(items)
+    except TypeError:
+        return None
 
-@dataclass(frozen=True)
+    def contains(actual: Any, value: Any) -> bool:
+        try:
+            return actual in members
+        except TypeError:  # unhashable actual, e.g. a list
+            return actual in items
+
+    return contains
+
+
+@dataclass(frozen=True, slots=True, kw_only=True)
 class CompareRule(Rule):
-    """Compares a value at `path` to `value` using `op`."""
+    """Compares a value at `path` to `value` using `op`.
+
+    `op` is resolved to its comparison function once, at construction.
+    """
 
     type_name: str
     path: str
     op: str
     value: Any = None
+    _fn: Callable[[Any, Any], Any] = field(init=False, repr=False, compare=False)
+    _cache_key: str = field(init=False, repr=False, compare=False)
+
+    cost_hint = 1
+    needs_now = False
+
+    def __post_init__(self) -> None:
+        try:
+            fn = _COMPARE_OPS[self.op]
+        except KeyError:
+            raise RuleSyntaxError(f"Unknown compare op '{self.op}'") from None
+        if self.op == "in" and isinstance(self.value, list):
+            fn = _in_members(self.value) or fn
+        object.__setattr__(self, "_fn", fn)
+        object.__setattr__(self, "path", sys.intern(self.path))
+        object.__setattr__(self, "_cache_key", sys.intern("path:" + self.path))
 
     def evaluate(self, ctx: EvaluationContext) -> bool:
-        ctx.bump("rule_eval")
-        cache_key = f"path:{self.path}"
-        if cache_key in ctx.cache:
-            actual = ctx.cache[cache_key]
-        else:
-            actual = deep_get(ctx.input, self.path, default=None)
-            ctx.cache[cache_key] = actual
+        ctx.bump_raw("rule_eval")
+        actual = ctx.lookup_raw(self._cache_key, self.path)
 
         if actual is None:
             if self.op == "exists":
                 return False
-            if ctx.strict == "raise":
-                raise RuleEvaluationError(f"Missing value at path '{self.path}'")
-            if ctx.strict == "warn":
-                ctx.bump("missing")
-            return False
+            return ctx.on_missing(self.path)
 
         try:
-            if self.op == "eq":
-                return actual == self.value
-            if self.op == "ne":
-                return actual != self.value
-            if self.op == "gt":
-                return actual > self.value
-            if self.op == "gte":
-                return actual >= self.value
-            if self.op == "lt":
-                return actual < self.value
-            if self.op == "lte":
-                return actual <= self.value
-            if self.op == "in":
-                return actual in (self.value or [])
-            if self.op == "contains":
-                return self.value in actual
-            if self.op == "exists":
-                return True
+            return self._fn(actual, self.value)
         except Exception as exc:  # noqa: BLE001
             raise RuleEvaluationError(str(exc)) from exc
 
-        raise RuleEvaluationError(f"Unknown compare op '{self.op}'")
-
     def explain(self, ctx: EvaluationContext) -> dict[str, Any]:
-        actual = deep_get(ctx.input, self.path, default=None)
+        actual = ctx.lookup_raw(self._cache_key, self.path)
         return {
             "type": "compare",
             "path": self.path,
@@ -87,20 +128,106 @@ class CompareRule(Rule):
             "result": self.evaluate(ctx),
         }
 
+    def emit(self, gen: CodeGen, target: str) -> None:
+        if type(self) is not CompareRule:
+            return Rule.emit(self, gen, target)
+        self._emit_compare(gen, target, f"{gen.const(self._fn)}(actual, {gen.const(self.value)})")
+
+    def _emit_compare(self, gen: CodeGen, target: str, expr: str) -> None:
+        # Mirrors `evaluate`, with `expr` comparing the local `actual`.
+        gen.bump("rule_eval")
+        gen.line(f"actual = {gen.lookup(self._cache_key, self.path)}")
+        with gen.block("if actual is None:"):
+            if self.op == "exists":
+                gen.line(f"{target} = False")
+            else:
+                gen.line(f"{target} = {gen.local('on_missing', 'ctx.on_missing')}({gen.const(self.path)})")
+        with gen.block("else:"):
+            with gen.block("try:"):
+                gen.line(f"{target} = {expr}")
+            with gen.block("except Exception as exc:"):
+                gen.line(f"raise {gen.const(RuleEvaluationError)}(str(exc)) from exc")
+
+
+class _EqRule(CompareRule):
+    """`CompareRule` specialized for `eq`."""
+
+    __slots__ = ()
+
+    def evaluate(self, ctx: EvaluationContext) -> bool:
+        ctx.bump_raw("rule_eval")
+        actual = ctx.lookup_raw(self._cache_key, self.path)
+        if actual is None:
+            return ctx.on_missing(self.path)
+        try:
+            return actual == self.value
+        except Exception as exc:  # noqa: BLE001
+            raise RuleEvaluationError(str(exc)) from exc
+
+    def emit(self, gen: CodeGen, target: str) -> None:
+        if type(self) is not _EqRule:
+            return Rule.emit(self, gen, target)
+        self._emit_compare(gen, target, f"actual == {gen.const(self.value)}")
+
+
+class _ExistsRule(CompareRule):
+    """`CompareRule` specialized for `exists`, which never treats a missing value as an error."""
+
+    __slots__ = ()
+
+    def evaluate(self, ctx: EvaluationContext) -> bool:
+        ctx.bump_raw("rule_eval")
+        return ctx.lookup_raw(self._cache_key, self.path) is not None
+
+    def emit(self, gen: CodeGen, target: str) -> None:
+        if type(self) is not _ExistsRule:
+            return Rule.emit(self, gen, target)
+        gen.bump("rule_eval")
+        gen.line(f"{target} = {gen.lookup(self._cache_key, self.path)} is not None")
+
 
-@dataclass(frozen=True)
+# Ops with a dedicated subclass; every other op uses the generic `CompareRule`.
+_COMPARE_CLASSES: dict[str, type[CompareRule]] = {"eq": _EqRule, "exists": _ExistsRule}
+
+
+@dataclass(frozen=True, slots=True, kw_only=True)
 class NotRule(Rule):
     type_name: str
     rule: Rule
 
+    @property
+    def cost_hint(self) -> int:
+        return getattr(self.rule, "cost_hint", 10) + 1
+
+    @property
+    def needs_now(self) -> bool:
+        return getattr(self.rule, "needs_now", True)
+
     def evaluate(self, ctx: EvaluationContext) -> bool:
         return not self.rule.evaluate(ctx)
 
+    def emit(self, gen: CodeGen, target: str) -> None:
+        if type(self) is not NotRule:
+            return Rule.emit(self, gen, target)
+        _emit(self.rule, gen, target)
+        gen.line(f"{target} = not {target}")
 
-@dataclass(frozen=True)
+
+@dataclass(frozen=True, slots=True, kw_only=True)
 class AllRule(Rule):
     type_name: str
-    rules: list[Rule]
+    rules: tuple[Rule, ...]
+
+    def __post_init__(self) -> None:
+        object.__setattr__(self, "rules", tuple(self.rules))
+
+    @property
+    def cost_hint(self) -> int:
+        return sum(getattr(r, "cost_hint", 10) for r in self.rules) + 1
+
+    @property
+    def needs_now(self) -> bool:
+        return any(getattr(r, "needs_now", True) for r in self.rules)
 
     def evaluate(self, ctx: EvaluationContext) -> bool:
         for rule in self.rules:
@@ -108,11 +235,27 @@ class AllRule(Rule):
                 return False
         return True
 
+    def emit(self, gen: CodeGen, target: str) -> None:
+        if type(self) is not AllRule:
+            return Rule.emit(self, gen, target)
+        emit_all(self.rules, gen, target)
 
-@dataclass(frozen=True)
+
+@dataclass(frozen=True, slots=True, kw_only=True)
 class AnyRule(Rule):
     type_name: str
-    rules: list[Rule]
+    rules: tuple[Rule, ...]
+
+    def __post_init__(self) -> None:
+        object.__setattr__(self, "rules", tuple(self.rules))
+
+    @property
+    def cost_hint(self) -> int:
+        return sum(getattr(r, "cost_hint", 10) for r in self.rules) + 1
+
+    @property
+    def needs_now(self) -> bool:
+        return any(getattr(r, "needs_now", True) for r in self.rules)
 
     def evaluate(self, ctx: EvaluationContext) -> bool:
         for rule in self.rules:
@@ -120,24 +263,76 @@ class AnyRule(Rule):
                 return True
         return False
 
+    def emit(self, gen: CodeGen, target: str) -> None:
+        if type(self) is not AnyRule:
+            return Rule.emit(self, gen, target)
+        if not self.rules:
+            gen.line(f"{target} = False")
+            return
+        first, *rest = self.rules
+        _emit(first, gen, target)
+        for rule in rest:
+            with gen.block(f"if not {target}:"):
+                _emit(rule, gen, target)
 
-@dataclass(frozen=True)
+
+@dataclass(frozen=True, slots=True, kw_only=True)
 class TruthyPathRule(Rule):
     """Treats a value at path as a boolean."""
 
     type_name: str
     path: str
+    _cache_key: str = field(init=False, repr=False, compare=False)
+
+    cost_hint = 1
+    needs_now = False
+
+    def __post_init__(self) -> None:
+        object.__setattr__(self, "path", sys.intern(self.path))
+        object.__setattr__(self, "_cache_key", sys.intern("path:" + self.path))
 
     def evaluate(self, ctx: EvaluationContext) -> bool:
-        val = deep_get(ctx.input, self.path, default=None)
+        val = ctx.lookup_raw(self._cache_key, self.path)
         if val is None:
-            if ctx.strict == "raise":
-                raise RuleEvaluationError(f"Missing value at path '{self.path}'")
-            if ctx.strict == "warn":
-                ctx.bump("missing")
-            return False
+            return ctx.on_missing(self.path)
         return is_truthy(val)
 
+    def emit(self, gen: CodeGen, target: str) -> None:
+        if type(self) is not TruthyPathRule:
+            return Rule.emit(self, gen, target)
+        gen.line(f"actual = {gen.lookup(self._cache_key, self.path)}")
+        with gen.block("if actual is None:"):
+            gen.line(f"{target} = {gen.local('on_missing', 'ctx.on_missing')}({gen.const(self.path)})")
+        with gen.block("else:"):
+            gen.line(f"{target} = {gen.const(is_truthy)}(actual)")
+
+
+def emit_all(rules: Iterable[Rule], gen: CodeGen, target: str) -> None:
+    """Emit a short-circuit conjunction of `rules` into `target`.
+
+    Siblings are guarded by `if target:` at the same depth, so only tree depth
+    (not rule count) adds indentation.
+    """
+
+    rules = list(rules)
+    if not rules:
+        gen.line(f"{target} = True")
+        return
+    first, *rest = rules
+    _emit(first, gen, target)
+    for rule in rest:
+        with gen.block(f"if {target}:"):
+            _emit(rule, gen, target)
+
+
+def _emit(rule: Rule, gen: CodeGen, target: str) -> None:
+    # Duck-typed rules (anything with `evaluate`) need not subclass `Rule`.
+    emit = getattr(rule, "emit", None)
+    if emit is None:
+        Rule.emit(rule, gen, target)
+    else:
+        emit(gen, target)
+
 
 def parse_compare_rule(spec: dict[str, Any]) -> CompareRule:
     """Parse a compare rule spec."""
@@ -148,4 +343,6 @@ def parse_compare_rule(spec: dict[str, Any]) -> CompareRule:
         raise RuleSyntaxError("compare rule requires non-empty 'path'")
     if not isinstance(op, str) or not op:
         raise RuleSyntaxError("compare rule requires non-empty 'op'")
-    return CompareRule(type_name="compare", path=path, op=op, value=spec.get("value"))
+    op = sys.intern(op)
+    cls = _COMPARE_CLASSES.get(op, CompareRule)
+    return cls(type_name="compare", path=path, op=op, value=spec.get("value"))
@@ -1,42 +1,145 @@
 from __future__ import annotations
 
-from collections.abc import Mapping
+import json
+import time
+from collections.abc import Iterable, Mapping
+from datetime import datetime, timezone
+from functools import lru_cache
 from typing import Any
 
+try:  # Optional speedup; see the "fast" extra.
+    import orjson
+except ImportError:  # pragma: no cover - depends on the environment
+    orjson = None
+
+_NOW_RESOLUTION = 0.001
+_MISSING = object()
+_FALSEY_STRINGS = frozenset(("", "0", "false", "no", "off"))
+# Exact spellings that are classified without normalizing the string first.
+_FALSEY_FAST = frozenset(v for s in _FALSEY_STRINGS for v in (s, s.capitalize(), s.upper()))
+_TRUTHY_FAST = frozenset(v for s in ("1", "true", "yes", "on") for v in (s, s.capitalize(), s.upper()))
+_now_cache: tuple[float, datetime] = (0.0, datetime.fromtimestamp(0, timezone.utc))
+
+
+def utc_now() -> datetime:
+    """Return the current UTC time, reused for calls within the same millisecond."""
+
+    global _now_cache
+    t = time.time()
+    if not 0 <= t - _now_cache[0] <= _NOW_RESOLUTION:  # also refresh if the clock went back
+        _now_cache = (t, datetime.fromtimestamp(t, timezone.utc))
+    return _now_cache[1]
+
+
+def json_loads(data: str | bytes) -> Any:
+    """Parse JSON, using orjson when it is installed.
+
+    Input orjson rejects but the stdlib accepts (NaN, Infinity) is re-parsed
+    with the stdlib; invalid input raises `json.JSONDecodeError`.
+    """
+
+    if orjson is not None:
+        try:
+            return orjson.loads(data)
+        except orjson.JSONDecodeError:
+            pass
+    return json.loads(data)
+
+
+def json_dumps_pretty(obj: Any) -> str:
+    """Serialize to indented JSON with sorted keys, for display.
+
+    Always uses the stdlib encoder so user-facing output does not depend on
+    whether orjson is installed.
+    """
+
+    return json.dumps(obj, indent=2, sort_keys=True)
+
+
+def json_dumps_canonical(obj: Any) -> bytes:
+    """Serialize to compact UTF-8 JSON bytes with sorted keys.
+
+    Always uses the stdlib encoder, so the bytes do not depend on whether
+    orjson is installed. Raises TypeError for values JSON cannot represent
+    and ValueError for NaN and infinities.
+    """
+
+    return json.dumps(
+        obj, sort_keys=True, separators=(",", ":"), ensure_ascii=False, allow_nan=False
+    ).encode("utf-8")
+
+
+def json_dumps_key(obj: Any) -> bytes:
+    """Like `json_dumps_canonical`, but faster and only stable within a process.
+
+    For in-memory cache keys: float formatting differs between backends and
+    orjson writes NaN and infinities as null, so callers must exclude
+    non-finite floats themselves.
+    """
+
+    if orjson is not None:
+        try:
+            return orjson.dumps(obj, option=orjson.OPT_SORT_KEYS)
+        except TypeError:
+            pass
+    return json.dumps(obj, sort_keys=True, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
 
 def deep_get(obj: Any, path: str, default: Any = None) -> Any:
-    parts = [p for p in path.split(".") if p]
+    return deep_get_parts(obj, [p for p in path.split(".") if p], default)
+
+
+def deep_get_parts(obj: Any, parts: Iterable[str], default: Any = None) -> Any:
+    """Like `deep_get`, but with the path already split into its parts."""
+
     cur = obj
     for part in parts:
-        if isinstance(cur, Mapping):
-            if part in cur:
-                cur = cur[part]
-                continue
+        if type(cur) is dict:
+            cur = cur.get(part, _MISSING)
+        else:
+            cur = get_part(cur, part, _MISSING)
+        if cur is _MISSING:
             return default
-        if isinstance(cur, (list, tuple)):
-            try:
-                index = int(part)
-            except ValueError:
-                return default
-            if -len(cur) <= index < len(cur):
-                cur = cur[index]
-                continue
+    return cur
+
+
+def get_part(obj: Any, part: str, default: Any = None) -> Any:
+    """Resolve a single path segment: a mapping key or a list/tuple index."""
+
+    t = type(obj)
+    if t is dict:
+        return obj.get(part, default)
+    # Exact lists/tuples skip the ABC checks; other types take the general path.
+    if t is not list and t is not tuple:
+        if isinstance(obj, Mapping):
+            return obj[part] if part in obj else default
+        if not isinstance(obj, (list, tuple)):
             return default
+    try:
+        index = int(part)
+    except ValueError:
         return default
-    return cur
+    if -len(obj) <= index < len(obj):
+        return obj[index]
+    return default
 
 
+@lru_cache(maxsize=4096)
 def normalize_key(key: str) -> str:
     return key.strip().lower().replace("-", "_")
 
 
 def is_truthy(value: Any) -> bool:
-    if value is None:
+    if value is None or value is False:
         return False
-    if isinstance(value, bool):
-        return value
+    if value is True:
+        return True
     if isinstance(value, (int, float)):
         return value != 0
     if isinstance(value, str):
-        return value.strip().lower() not in {"", "0", "false", "no", "off"}
+        if value in _TRUTHY_FAST:
+            return True
+        if value in _FALSEY_FAST:
+            return False
+        return value.strip().lower() not in _FALSEY_STRINGS
     return True
@@ -0,0 +1,71 @@
+import json
+
+import pytest
+
+import policyeval.utils
+from policyeval.cli import main
+
+POLICY = '{"name": "admin-only", "rules": [{"type": "compare", "path": "user.role", "op": "eq", "value": "admin"}]}'
+USAGE = "usage: policyeval evaluate --policy POLICY --input INPUT [--strict STRICT] [--explain]"
+
+
+@pytest.mark.parametrize(
+    "argv",
+    [
+        ["--policy", POLICY, "--input", '{"user": {"role": "admin"}}'],
+        [f"--policy={POLICY}", '--input={"user": {"role": "admin"}}', "--strict=raise"],
+        ["--pol", POLICY, '--inp={"user": {"role": "admin"}}', "--str", "raise"],
+    ],
+)
+def test_evaluate_accepts_both_flag_forms(capsys, argv):
+    assert main(["evaluate", *argv]) == 0
+    assert capsys.readouterr().out == "allow\n"
+
+
+def test_evaluate_accepts_abbreviated_explain(capsys):
+    assert main(["evaluate", "--policy", POLICY, "--input", '{"user": {"role": "admin"}}', "--exp"]) == 0
+    assert capsys.readouterr().out.startswith("{\n")
+
+
+def test_evaluate_help_prints_usage(capsys):
+    assert main(["evaluate", "-h"]) == 0
+    assert capsys.readouterr().out.startswith(USAGE)
+
+
+@pytest.mark.parametrize(
+    "argv, message",
+    [
+        (["--policy", POLICY], "the following arguments are required: --input"),
+        (["--policy", POLICY, "--input", "{}", "--verbose"], "unrecognized arguments: --verbose"),
+        (["--policy", POLICY, "--input", "{}", "--strict", "loud"], "argument --strict: invalid choice: 'loud'"),
+        (["--policy", "--input", "{}"], "argument --policy: expected one argument"),
+    ],
+)
+def test_evaluate_usage_errors_exit_2(capsys, argv, message):
+    assert main(["evaluate", *argv]) == 2
+    err = capsys.readouterr().err.splitlines()
+    assert err[0] == USAGE
+    assert err[1].startswith(f"policyeval evaluate: error: {message}")
+
+
+
+@pytest.mark.parametrize("use_orjson", [True, False])
+def test_explain_output_does_not_depend_on_json_backend(monkeypatch, capsys, use_orjson):
+    if not use_orjson:
+        monkeypatch.setattr(policyeval.utils, "orjson", None)
+    elif policyeval.utils.orjson is None:
+        pytest.skip("orjson is not installed")
+    policy = json.dumps(
+        {
+            "name": "x",
+            "rules": [
+                {"type": "compare", "path": "n", "op": "lt", "value": 1e100},
+                {"type": "compare", "path": "s", "op": "ne", "value": "café"},
+            ],
+        }
+    )
+    assert main(["evaluate", "--policy", policy, "--input", '{"n": 1, "s": "tea"}', "--explain"]) == 0
+    out = capsys.readouterr().out
+    assert '"value": 1e+100' in out
+    assert '"value": "caf\\u00e9"' in out
+    assert out == json.dumps(json.loads(out), indent=2, sort_keys=True) + "\n"
@@ -0,0 +1,24 @@
+from policyeval.context import EvaluationContext
+
+
+def test_cache_evicts_least_recently_used_entry():
+    ctx = EvaluationContext(input={}, cache_maxsize=3)
+    for key in ("a", "b", "c"):
+        assert ctx.cache_get(key, lambda key=key: key.upper()) == key.upper()
+
+    assert ctx.cache_get("a", lambda: "stale") == "A"
+    assert list(ctx.cache) == ["b", "c", "a"]
+
+    ctx.cache_get("d", lambda: "D")
+    assert list(ctx.cache) == ["c", "a", "d"]
+
+
+def test_lookup_handles_very_long_paths():
+    data = leaf = {}
+    for _ in range(2000):
+        leaf["k"] = {}
+        leaf = leaf["k"]
+    leaf["k"] = "deep"
+    ctx = EvaluationContext(input=data)
+    assert ctx.lookup(".".join(["k"] * 2001)) == "deep"
+    assert ctx.lookup(".".join(["k"] * 2002)) is None
@@ -1,4 +1,9 @@
-from policyeval import PolicyEngine, load_policy
+import pytest
+
+from policyeval import PolicyEngine, RuleEvaluationError, RuleRegistry, load_policy
+from policyeval.engine import Policy
+from policyeval.registry import register_builtin_rules
+from policyeval.rules import NotRule, TruthyPathRule
 
 
 def test_allow_when_rule_matches():
@@ -44,3 +49,267 @@ def test_deny_effect_inverts_match():
     engine = PolicyEngine()
     decision = engine.evaluate(policy, {"user": {"role": "admin"}})
     assert decision.allowed is False
+
+
+def test_evaluate_compiles_spec_once():
+    policy = load_policy(
+        {
+            "name": "admin-only",
+            "rules": [
+                {"type": "compare", "path": "user.role", "op": "eq", "value": "admin"}
+            ],
+        }
+    )
+    engine = PolicyEngine()
+    calls = []
+    original = engine.compile
+
+    def counting_compile(spec):
+        calls.append(spec)
+        return original(spec)
+
+    engine.compile = counting_compile
+    engine.evaluate(policy, {"user": {"role": "admin"}})
+    engine.evaluate(policy, {"user": {"role": "user"}})
+    assert len(calls) == 1
+
+
+def test_reorder_runs_cheap_rules_first():
+    policy = load_policy(
+        {
+            "name": "reordered",
+            "rules": [
+                {
+                    "type": "any",
+                    "rules": [
+                        {"type": "not", "rule": {"type": "truthy", "path": "a"}},
+                        {"type": "truthy", "path": "b"},
+                    ],
+                },
+                {"type": "compare", "path": "user.role", "op": "eq", "value": "admin"},
+            ],
+        }
+    )
+    compiled = PolicyEngine(reorder=True).compile(policy)
+    assert [r.type_name for r in compiled.rules] == ["compare", "any"]
+    assert [r.type_name for r in compiled.rules[1].rules] == ["truthy", "not"]
+
+
+def test_reorder_can_change_which_rule_errors():
+    policy = load_policy(
+        {
+            "name": "nested",
+            "rules": [
+                {
+                    "type": "any",
+                    "rules": [
+                        {
+                            "type": "all",
+                            "rules": [
+                                {"type": "compare", "path": "a", "op": "eq", "value": 0},
+                                {"type": "compare", "path": "b", "op": "eq", "value": 0},
+                            ],
+                        },
+                        {"type": "compare", "path": "c", "op": "gt", "value": 5},
+                    ],
+                }
+            ],
+        }
+    )
+    payload = {"a": 0, "b": 0, "c": "x"}
+    assert PolicyEngine().evaluate(policy, payload).allowed is True
+    with pytest.raises(RuleEvaluationError):
+        PolicyEngine(reorder=True).evaluate(policy, payload)
+
+
+def test_reorder_of_top_level_rules_can_change_which_rule_errors():
+    policy = load_policy(
+        {
+            "name": "top-level",
+            "rules": [
+                {
+                    "type": "all",
+                    "rules": [
+                        {"type": "compare", "path": "a", "op": "eq", "value": 1},
+                        {"type": "compare", "path": "b", "op": "eq", "value": 1},
+                    ],
+                },
+                {"type": "compare", "path": "c", "op": "gt", "value": 5},
+            ],
+        }
+    )
+    payload = {"a": 0, "b": 0, "c": "x"}
+    assert PolicyEngine().evaluate(policy, payload).allowed is False
+    with pytest.raises(RuleEvaluationError):
+        PolicyEngine(reorder=True).evaluate(policy, payload)
+
+
+def test_strict_raise_on_missing_value():
+    policy = load_policy(
+        {
+            "name": "admin-only",
+            "rules": [
+                {"type": "compare", "path": "user.role", "op": "eq", "value": "admin"}
+            ],
+        }
+    )
+    engine = PolicyEngine()
+    with pytest.raises(RuleEvaluationError):
+        engine.evaluate(policy, {}, strict="raise")
+    with pytest.raises(ValueError):
+        engine.evaluate(policy, {}, strict="loud")
+
+
+def test_evaluate_many_returns_one_decision_per_input():
+    policy = load_policy(
+        {
+            "name": "admin-only",
+            "rules": [
+                {"type": "compare", "path": "user.role", "op": "eq", "value": "admin"}
+            ],
+        }
+    )
+    engine = PolicyEngine()
+    inputs = [{"user": {"role": "admin"}}, {"user": {"role": "user"}}, {}]
+    decisions = engine.evaluate_many(policy, inputs)
+    assert [d.allowed for d in decisions] == [True, False, False]
+
+
+def test_explain_metrics_do_not_leak_between_evaluations():
+    policy = load_policy(
+        {
+            "name": "admin-only",
+            "rules": [
+                {"type": "compare", "path": "user.role", "op": "eq", "value": "admin"}
+            ],
+        }
+    )
+    engine = PolicyEngine()
+    first = engine.explain(policy, {})
+    second = engine.explain(policy, {})
+    assert first["metrics"] == second["metrics"] == {"rule_eval": 1, "missing": 1}
+
+
+@pytest.mark.parametrize("count", [0, 3, 100])
+def test_rules_are_and_chained_for_any_rule_count(count):
+    rules = [{"type": "truthy", "path": f"flags.{i}"} for i in range(count)]
+    policy = load_policy({"name": "flags", "rules": rules})
+    engine = PolicyEngine()
+    all_set = {"flags": [True] * count}
+    assert engine.evaluate(policy, all_set).allowed is True
+    if count:
+        one_unset = {"flags": [True] * (count - 1) + [False]}
+        assert engine.evaluate(policy, one_unset).allowed is False
+
+
+def test_trace_reports_first_failing_rule():
+    policy = load_policy(
+        {
+            "name": "flags",
+            "rules": [
+                {"type": "truthy", "path": "a"},
+                {"type": "truthy", "path": "b"},
+                {"type": "truthy", "path": "c"},
+            ],
+        }
+    )
+    engine = PolicyEngine()
+    decision = engine.evaluate(policy, {"a": 1, "b": 0, "c": 1}, trace=True)
+    assert decision.allowed is False
+    assert decision.explanation == {"failed_at": 1}
+    decision = engine.evaluate(policy, {"a": 1, "b": 1, "c": 1}, trace=True)
+    assert decision.explanation == {"failed_at": None}
+
+
+@pytest.mark.parametrize("depth", [2, 150])
+def test_nested_rule_trees_evaluate_at_any_depth(depth):
+    # Alternating any/all groups; deep trees exceed the generated code's
+    # nesting limit and fall back to calling each rule's evaluate().
+    spec = {"type": "truthy", "path": "leaf"}
+    for i in range(depth):
+        group = "any" if i % 2 else "all"
+        spec = {"type": group, "rules": [{"type": "compare", "path": "n", "op": "gte", "value": 0}, spec]}
+    policy = load_policy({"name": "nested", "rules": [spec, {"type": "not", "rule": {"type": "truthy", "path": "off"}}]})
+    engine = PolicyEngine()
+    assert engine.evaluate(policy, {"n": 1, "leaf": True}).allowed is True
+    assert engine.evaluate(policy, {"n": -1, "leaf": True}).allowed is False
+    assert engine.evaluate(policy, {"n": 1, "leaf": True, "off": 1}).allowed is False
+
+
+def test_in_op_matches_list_membership():
+    policy = load_policy({"name": "allow-list", "rules": [{"type": "compare", "path": "v", "op": "in", "value": ["a", 1]}]})
+    engine = PolicyEngine()
+    results = [engine.evaluate(policy, {"v": v}).allowed for v in ("a", 1, True, 1.0, "b", [1], {"k": 1})]
+    assert results == [True, True, True, True, False, False, False]
+
+
+def test_compiled_policy_follows_engine_configuration_changes():
+    policy = load_policy({"name": "flag", "rules": [{"type": "truthy", "path": "a"}]})
+    engine = PolicyEngine()
+    engine.registry = RuleRegistry()
+    register_builtin_rules(engine.registry)
+    assert engine.evaluate(policy, {"a": 1}).allowed is True
+
+    engine.registry.register("truthy", lambda spec, r: NotRule(type_name="not", rule=TruthyPathRule(type_name="truthy", path="a")))
+    assert engine.evaluate(policy, {"a": 1}).allowed is False
+
+    replacement = RuleRegistry()
+    register_builtin_rules(replacement)
+    engine.registry = replacement
+    assert engine.evaluate(policy, {"a": 1}).allowed is True
+
+    engine.reorder = True
+    assert engine.evaluate(policy, {"a": 1}).allowed is True
+    assert engine._resolve(policy) is engine._resolve(policy)
+
+
+def test_strict_members_compare_equal_to_their_names():
+    engine = PolicyEngine(strict="raise")
+    assert engine.strict == "raise"
+    assert engine.strict != "warn"
+    assert "raise" in {engine.strict}
+    assert {"raise": 1}.get(engine.strict) == 1
+
+
+class _DuckRule:
+    """A rule that only implements `evaluate`."""
+
+    def __init__(self, path):
+        self.path = path
+
+    def evaluate(self, ctx):
+        return ctx.lookup(self.path) == "yes"
+
+
+def test_rules_without_emit_are_called_through_evaluate():
+    registry = RuleRegistry()
+    register_builtin_rules(registry)
+    registry.register("duck", lambda spec, r: _DuckRule(spec["path"]))
+    policy = load_policy(
+        {
+            "name": "duck",
+            "rules": [
+                {"type": "duck", "path": "a"},
+                {"type": "any", "rules": [{"type": "truthy", "path": "b"}, {"type": "duck", "path": "c"}]},
+                {"type": "not", "rule": {"type": "duck", "path": "d"}},
+            ],
+        },
+        registry,
+    )
+    engine = PolicyEngine(registry)
+    assert engine.evaluate(policy, {"a": "yes", "c": "yes"}).allowed is True
+    assert engine.evaluate(policy, {"a": "yes", "c": "yes", "d": "yes"}).allowed is False
+
+    direct = Policy(name="direct", effect="allow", rules=(_DuckRule("a"),))
+    assert engine.evaluate(direct, {"a": "yes"}).allowed is True
+    assert Policy(name="nested", effect="allow", rules=(NotRule(type_name="not", rule=_DuckRule("a")),)).uses_now
+
+
+def test_reorder_accepts_rules_without_cost_hint():
+    registry = RuleRegistry()
+    register_builtin_rules(registry)
+    registry.register("duck", lambda spec, r: _DuckRule(spec["path"]))
+    policy = load_policy(
+        {"name": "duck", "rules": [{"type": "any", "rules": [{"type": "duck", "path": "a"}]}]}, registry
+    )
+    assert PolicyEngine(registry, reorder=True).evaluate(policy, {"a": "yes"}).allowed is True
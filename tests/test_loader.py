@@ -1,6 +1,15 @@
+import dataclasses
+import gc
+import json
+import os
+import pickle
+import weakref
+
 import pytest
 
-from policyeval import PolicyLoadError, load_policy
+import policyeval.utils
+from policyeval import PolicyEngine, PolicyLoadError, RuleRegistry, UnknownRuleError, load_policies, load_policy
+from policyeval.registry import register_builtin_rules
 
 
 def test_load_policy_requires_name():
@@ -11,3 +20,119 @@ def test_load_policy_requires_name():
 def test_load_policy_validates_effect():
     with pytest.raises(PolicyLoadError):
         load_policy({"name": "x", "effect": "permit", "rules": []})
+
+
+def test_load_policy_rejects_invalid_json():
+    with pytest.raises(PolicyLoadError):
+        load_policy('{"name": "x",')
+
+
+def test_load_policy_from_file_relative_to_base_dir(tmp_path):
+    (tmp_path / "policy.json").write_bytes(b'{"name": "from-file", "rules": []}')
+    spec = load_policy("policy.json", base_dir=str(tmp_path))
+    assert spec.name == "from-file"
+    assert spec.effect == "allow"
+
+
+def test_load_policy_caches_unchanged_files(tmp_path):
+    path = tmp_path / "policy.json"
+    path.write_text('{"name": "v1", "rules": []}', encoding="utf-8")
+    first = load_policy(str(path))
+    assert load_policy(str(path)) is first
+
+    path.write_text('{"name": "v2", "effect": "deny", "rules": []}', encoding="utf-8")
+    assert load_policy(str(path)).name == "v2"
+
+
+def test_load_policy_reloads_same_size_rewrite_with_new_mtime(tmp_path):
+    path = tmp_path / "policy.json"
+    path.write_text('{"name": "v1", "rules": []}', encoding="utf-8")
+    assert load_policy(str(path)).name == "v1"
+    mtime_ns = path.stat().st_mtime_ns
+
+    path.write_text('{"name": "v2", "rules": []}', encoding="utf-8")
+    os.utime(path, ns=(mtime_ns + 1_000_000_000, mtime_ns + 1_000_000_000))
+    assert load_policy(str(path)).name == "v2"
+
+
+def test_file_cache_does_not_keep_registries_alive(tmp_path):
+    path = tmp_path / "policy.json"
+    path.write_text('{"name": "x", "rules": [{"type": "truthy", "path": "a"}]}', encoding="utf-8")
+    registry = RuleRegistry()
+    register_builtin_rules(registry)
+    load_policy(str(path), registry)
+    ref = weakref.ref(registry)
+    del registry
+    gc.collect()
+    assert ref() is None
+
+
+def test_load_policy_rejects_non_object_json():
+    with pytest.raises(PolicyLoadError):
+        load_policy('[{"name": "x"}]')
+
+
+def test_load_policies_reads_json_files_in_name_order(tmp_path):
+    (tmp_path / "b.json").write_text('{"name": "b", "rules": []}', encoding="utf-8")
+    (tmp_path / "a.json").write_text('{"name": "a", "rules": []}', encoding="utf-8")
+    (tmp_path / "notes.txt").write_text("ignored", encoding="utf-8")
+    specs = load_policies(str(tmp_path))
+    assert [s.name for s in specs] == ["a", "b"]
+    assert load_policies(str(tmp_path))[0] is specs[0]
+
+
+def test_load_policies_errors_name_the_failing_file(tmp_path):
+    (tmp_path / "a.json").write_text('{"name": "a", "rules": []}', encoding="utf-8")
+    (tmp_path / "b.json").write_text('{"rules": []}', encoding="utf-8")
+    with pytest.raises(PolicyLoadError, match=r"b\.json: policy requires non-empty 'name'"):
+        load_policies(str(tmp_path))
+
+
+def test_policy_spec_to_bytes_is_canonical():
+    a = load_policy({"name": "x", "rules": [{"type": "truthy", "path": "a"}]})
+    b = load_policy('{"rules": [{"path": "a", "type": "truthy"}], "effect": "allow", "name": "x"}')
+    assert a.to_bytes() == b.to_bytes()
+    assert json.loads(a.to_bytes()) == {"name": "x", "effect": "allow", "rules": [{"type": "truthy", "path": "a"}]}
+
+
+@pytest.mark.parametrize("use_orjson", [True, False])
+def test_policy_spec_to_bytes_does_not_depend_on_json_backend(monkeypatch, use_orjson):
+    if not use_orjson:
+        monkeypatch.setattr(policyeval.utils, "orjson", None)
+    elif policyeval.utils.orjson is None:
+        pytest.skip("orjson is not installed")
+    rule = {"type": "compare", "path": "a", "op": "lt", "value": 1e100}
+    spec = {"name": "café", "effect": "allow", "rules": [rule]}
+    assert load_policy(spec).to_bytes() == (
+        '{"effect":"allow","name":"café","rules":[{"op":"lt","path":"a","type":"compare","value":1e+100}]}'
+    ).encode("utf-8")
+
+    nan_rule = {"type": "compare", "path": "a", "op": "eq", "value": float("nan")}
+    with pytest.raises(ValueError):
+        load_policy({"name": "x", "rules": [nan_rule]}).to_bytes()
+
+
+def test_load_policy_rejects_unknown_compare_op():
+    with pytest.raises(PolicyLoadError):
+        load_policy({"name": "x", "rules": [{"type": "compare", "path": "a", "op": "like"}]})
+
+
+def test_load_policy_without_validation_defers_unknown_rule_errors():
+    policy = load_policy({"name": "x", "rules": [{"type": "nope"}]}, validate=False)
+    assert policy.rules == ({"type": "nope"},)
+    with pytest.raises(UnknownRuleError):
+        PolicyEngine().evaluate(policy, {})
+
+
+def test_replaced_policy_spec_does_not_reuse_prebuilt_rules():
+    spec = load_policy({"name": "x", "rules": [{"type": "compare", "path": "role", "op": "eq", "value": "admin"}]})
+    user = dataclasses.replace(spec, rules=({"type": "compare", "path": "role", "op": "eq", "value": "user"},))
+    assert PolicyEngine().evaluate(user, {"role": "user"}).allowed is True
+
+
+def test_validated_policy_spec_pickles_without_prebuilt_rules():
+    spec = load_policy({"name": "x", "rules": [{"type": "truthy", "path": "a"}]})
+    restored = pickle.loads(pickle.dumps(spec))
+    assert restored == spec
+    assert restored._compiled is None
+    assert PolicyEngine().evaluate(restored, {"a": 1}).allowed is True
@@ -0,0 +1,51 @@
+from policyeval import RuleRegistry
+from policyeval.registry import register_builtin_rules
+
+
+def test_create_shares_rules_for_identical_specs():
+    registry = RuleRegistry()
+    register_builtin_rules(registry)
+    spec = {"type": "compare", "path": "user.role", "op": "eq", "value": "admin"}
+    assert registry.create(dict(spec)) is registry.create(dict(spec))
+    assert registry.create({**spec, "value": 1}) is not registry.create({**spec, "value": True})
+
+
+def test_register_invalidates_compiled_rules():
+    registry = RuleRegistry()
+    register_builtin_rules(registry)
+    spec = {"type": "truthy", "path": "a"}
+    first = registry.create(spec)
+    registry.register("noop", lambda spec, r: first)
+    assert registry.create(spec) is not first
+
+
+def test_nested_all_rules_are_flattened():
+    registry = RuleRegistry()
+    register_builtin_rules(registry)
+    a, b, c = ({"type": "truthy", "path": p} for p in "abc")
+    rule = registry.create({"type": "all", "rules": [{"type": "all", "rules": [a, b]}, {"type": "any", "rules": [c]}]})
+    assert [r.type_name for r in rule.rules] == ["truthy", "truthy", "any"]
+
+
+def test_create_does_not_share_rules_across_non_json_values():
+    registry = RuleRegistry()
+    register_builtin_rules(registry)
+    spec = {"type": "compare", "path": "v", "op": "eq"}
+    as_tuple = registry.create({**spec, "value": (1, 2)})
+    as_list = registry.create({**spec, "value": [1, 2]})
+    assert as_list is not as_tuple
+    assert as_list.value == [1, 2]
+    assert registry.create({**spec, "value": {1: "x"}}) is not registry.create({**spec, "value": {"1": "x"}})
+
+    circular: list = []
+    circular.append(circular)
+    assert registry.create({**spec, "value": circular}).value is circular
+
+
+def test_create_does_not_memoize_custom_rule_types():
+    registry = RuleRegistry()
+    register_builtin_rules(registry)
+    registry.register("custom", lambda spec, r: object())
+    assert registry.create({"type": "custom"}) is not registry.create({"type": "custom"})
+    spec = {"type": "not", "rule": {"type": "custom"}}
+    assert registry.create(spec) is not registry.create(spec)
@@ -0,0 +1,28 @@
+import json
+import math
+from datetime import datetime, timezone
+
+import policyeval.utils
+
+from policyeval.utils import json_dumps_canonical, json_dumps_pretty, json_loads, utc_now
+
+
+def test_json_helpers_accept_what_the_stdlib_accepts():
+    assert math.isnan(json_loads("NaN"))
+    assert json_loads('{"x": Infinity}') == {"x": math.inf}
+
+    big = {"n": 2**70}
+    assert json_dumps_canonical(big) == json.dumps(big).replace(" ", "").encode("utf-8")
+    assert json.loads(json_dumps_pretty(big)) == big
+
+
+def test_utc_now_follows_the_clock_backwards(monkeypatch):
+    now = [1_000_000.0]
+    monkeypatch.setattr(policyeval.utils.time, "time", lambda: now[0])
+    assert utc_now() == datetime.fromtimestamp(1_000_000.0, timezone.utc)
+
+    now[0] = 1_000_000.0005
+    assert utc_now() == datetime.fromtimestamp(1_000_000.0, timezone.utc)
+
+    now[0] = 999_000.0
+    assert utc_now() == datetime.fromtimestamp(999_000.0, timezone.utc)